@@ -0,0 +1,17 @@
+import asyncio
+from typing import Optional
+from playwright.async_api import async_playwright, Playwright
+
+
+# One Playwright driver process shared by every browser in the app, living as long as the process
+_pw: Optional[Playwright] = None
+_lock = asyncio.Lock()
+
+
+async def get_pw() -> Playwright:
+    """Return the process-wide Playwright instance, starting it on first use."""
+    global _pw
+    async with _lock:
+        if _pw is None:
+            _pw = await async_playwright().start()
+    return _pw
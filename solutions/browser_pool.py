@@ -0,0 +1,81 @@
+import asyncio
+import os
+from typing import Optional
+from playwright.async_api import Browser, BrowserContext
+from _pw import get_pw
+
+
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--headless=new'
+]
+
+
+class BrowserPool:
+    """A process-wide pool of pre-warmed browser contexts sharing one browser.
+
+    Launching Chromium is far more expensive than creating a context, so the
+    browser is started once and contexts are handed out and taken back. Pooled
+    contexts are only for short-lived internal work; per-user sessions get their
+    own context from new_context().
+
+    Attributes:
+        size (int): Number of idle contexts kept warm
+    """
+
+    def __init__(self, size: int = 4):
+        self.size = size
+        self._browser: Optional[Browser] = None
+        self._contexts: asyncio.LifoQueue[BrowserContext] = asyncio.LifoQueue()
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Launch the shared browser and pre-create the idle contexts."""
+        async with self._lock:
+            if self._browser and self._browser.is_connected():
+                return
+            playwright = await get_pw()
+            self._browser = await playwright.chromium.launch(args=BROWSER_ARGS, headless=True)
+            self._contexts = asyncio.LifoQueue()
+            for _ in range(self.size):
+                self._contexts.put_nowait(await self._browser.new_context())
+
+    async def acquire(self) -> BrowserContext:
+        """Take an idle context, creating a new one when the pool is drained."""
+        await self.start()
+        try:
+            return self._contexts.get_nowait()
+        except asyncio.QueueEmpty:
+            return await self._browser.new_context()
+
+    async def new_context(self) -> BrowserContext:
+        """Create a fresh context on the shared browser that is never pooled.
+
+        Use this for anything tied to one user, since a recycled context keeps
+        its storage, service workers and HTTP cache. The caller closes it.
+        """
+        await self.start()
+        return await self._browser.new_context()
+
+    async def release(self, context: BrowserContext):
+        """Return a context to the pool, or close it if the pool is already full."""
+        if self._contexts.qsize() >= self.size or not self._browser or not self._browser.is_connected():
+            try:
+                await context.close()
+            except Exception:
+                pass  # Ignore cleanup errors
+            return
+
+        try:
+            for page in context.pages:
+                await page.close()
+            await context.clear_cookies()
+        except Exception:
+            await context.close()
+            return
+        self._contexts.put_nowait(context)
+
+
+pool = BrowserPool(int(os.getenv("BROWSER_POOL_SIZE", "4")))
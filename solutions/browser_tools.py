@@ -1,6 +1,58 @@
-from typing import Dict, Any, Optional
-from urllib.parse import urlparse
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout, Page, Browser
+import asyncio
+import re
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse, urlsplit
+from playwright.async_api import TimeoutError as PlaywrightTimeout, Page, BrowserContext, Route, Request
+from browser_pool import pool
+from http_cache import HttpCache, is_storable, request_key
+
+CACHE_MODES = ("record", "replay", "off")
+
+# Scheme, optional userinfo, a non-empty host name or bracketed IPv6 literal,
+# an optional port, then the end or a path/query/fragment
+URL_RE = re.compile(
+    r"^https?://(?:[^\s/?#@]+@)?(?:[^/\s?#\[\]@:]+|\[[0-9A-Fa-f:.]+\])(?::\d+)?(?:[/?#]|$)"
+)
+
+# How long a custom selector missing from the batched extraction may take to appear
+SELECTOR_RETRY_TIMEOUT = 500
+
+# Resources that text extraction never reads
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+BLOCKED_HOSTS = ("doubleclick.net", "google-analytics.com", "googletagmanager.com", "segment.io", "segment.com")
+
+# Runs in the page; resolves everything extract_content needs in one evaluate call
+EXTRACT_JS = """
+    (selectors) => {
+        const mainElement = document.querySelector('article, main, [role="main"]')
+            || document.querySelector('.content, #content, [class*="content"]');
+        const selected = {};
+        for (const [key, selector] of Object.entries(selectors)) {
+            try {
+                const element = document.querySelector(selector);
+                selected[key] = element ? element.innerText : null;
+            } catch (e) {
+                // Not plain CSS (text=, xpath=, >> chains): resolved by Playwright instead
+                selected[key] = null;
+            }
+        }
+        return {
+            title: document.title,
+            url: location.href,
+            text: document.body.innerText,
+            main_content: mainElement ? mainElement.innerText : document.body.innerText,
+            links: Array.from(document.querySelectorAll('a[href]')).map(a => ({
+                text: a.innerText,
+                href: a.href
+            })).filter(link => link.text.trim() && link.href.startsWith('http')),
+            selected
+        };
+    }
+"""
+
+# Installed on every page so the extractor is compiled once per document, not per call
+INSTALL_EXTRACT_JS = f"window.__extract = {EXTRACT_JS.strip()};"
+CALL_EXTRACT_JS = "(selectors) => window.__extract ? window.__extract(selectors) : null"
 
 
 class BrowserError(Exception):
@@ -25,16 +77,37 @@ class BrowserTools:
     error handling, resource management, and timeout controls.
 
     Attributes:
-        browser (Browser): Playwright browser instance
+        context (BrowserContext): Browser context supplied by the caller or borrowed from the shared pool
         page (Page): Current browser page
         default_timeout (int): Default timeout for operations in milliseconds
+        cache_mode (str): "record" replays cached responses and stores new ones,
+            "replay" only serves what is already cached, "off" disables the cache
+        lightweight (bool): Skip images, media, fonts, stylesheets and trackers,
+            for workloads that only extract text and links
+        isolated (bool): Create a fresh, never-recycled context on first use instead
+            of borrowing a pooled one, for browsing done on behalf of one user
     """
 
-    def __init__(self, default_timeout: int = 30000):
-        self.browser: Optional[Browser] = None
+    def __init__(
+        self,
+        default_timeout: int = 30000,
+        cache_mode: str = "off",
+        cache: Optional[HttpCache] = None,
+        context: Optional[BrowserContext] = None,
+        lightweight: bool = False,
+        isolated: bool = False
+    ):
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"cache_mode must be one of {CACHE_MODES}, got {cache_mode!r}")
+        self.context = context
+        self._owns_context = context is None
         self.page: Optional[Page] = None
         self.default_timeout = default_timeout
-        self._playwright = None
+        self.cache_mode = cache_mode
+        self.lightweight = lightweight
+        self.isolated = isolated
+        self._cache = cache or (HttpCache() if cache_mode != "off" else None)
+        self._owns_cache = cache is None
 
     async def __aenter__(self):
         """Async context manager entry."""
@@ -46,15 +119,19 @@ class BrowserTools:
         await self.cleanup()
 
     @staticmethod
-    def validate_url(url: str) -> bool:
+    def validate_url(url: str, strict: bool = False) -> bool:
         """Validate if a URL is properly formatted.
 
         Args:
             url (str): URL to validate
+            strict (bool): Run the full URL parser instead of the http(s) pattern check
 
         Returns:
             bool: True if URL is valid, False otherwise
         """
+        if not strict:
+            return bool(URL_RE.match(url))
+
         try:
             result = urlparse(url)
             return all([result.scheme, result.netloc])
@@ -62,54 +139,140 @@ class BrowserTools:
             return False
 
     async def setup(self):
-        """Initialize the browser if not already done."""
-        if not self.browser:
+        """Open a page, getting a browser context from the pool if none was supplied."""
+        if not self.page:
             try:
-                print("Starting Playwright...")
-                self._playwright = await async_playwright().start()
-                print("Launching browser...")
-                self.browser = await self._playwright.chromium.launch(
-                    args=[
-                        '--no-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-gpu',
-                        '--headless=new'
-                    ],
-                    headless=True
-                )
+                if not self.context:
+                    print("Acquiring browser context...")
+                    self.context = await (pool.new_context() if self.isolated else pool.acquire())
+                    self._owns_context = True
                 print("Creating new page...")
-                self.page = await self.browser.new_page()
-                await self.page.set_default_timeout(self.default_timeout)
+                self.page = await self.context.new_page()
                 print("Setting up event handlers...")
-                self.page.on("pageerror", lambda exc: print(f"Page error: {exc}"))
-                self.page.on("crash", lambda: print("Page crashed"))
+                await self._prepare_page(self.page)
                 print("Browser setup complete")
             except Exception as e:
                 print(f"Browser initialization error: {str(e)}")
-                if self._playwright:
-                    await self._playwright.stop()
-                    self._playwright = None
+                self.page = None
+                if self.context and self._owns_context:
+                    await self._close_context()
                 raise BrowserError(f"Failed to initialize browser: {str(e)}")
 
+    async def _prepare_page(self, page: Page):
+        """Apply timeouts, event handlers and request routing to a new page."""
+        page.set_default_timeout(self.default_timeout)
+        page.on("pageerror", lambda exc: print(f"Page error: {exc}"))
+        page.on("crash", lambda: print("Page crashed"))
+        await page.add_init_script(INSTALL_EXTRACT_JS)
+        if self._cache:
+            await page.route("**/*", self._cache_handler)
+        # Registered last so it sees requests first and falls back to the cache
+        if self.lightweight:
+            await page.route("**/*", self._block_handler)
+
+    @staticmethod
+    async def _block_handler(route: Route):
+        """Abort requests for resources that are not needed to read the page."""
+        request = route.request
+        host = urlsplit(request.url).hostname or ""
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+            host == blocked or host.endswith("." + blocked) for blocked in BLOCKED_HOSTS
+        ):
+            await route.abort()
+        else:
+            await route.fallback()
+
+    async def _cache_handler(self, route: Route, request: Request):
+        """Serve a request from the HTTP cache, recording it first when missing."""
+        key = request_key(request.method, request.url, request.post_data_buffer)
+        # sqlite work runs off the event loop so other sessions keep moving
+        cached = await asyncio.to_thread(self._cache.get, key)
+        if cached:
+            status, headers, body = cached
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        if self.cache_mode != "record":
+            await route.continue_()
+            return
+
+        try:
+            response = await route.fetch(max_redirects=0)
+            body = await response.body()
+        except Exception:
+            await route.continue_()
+            return
+
+        if is_storable(response.status, response.headers):
+            await asyncio.to_thread(self._cache.put, key, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
     async def cleanup(self):
-        """Clean up browser resources safely."""
-        if self.browser:
+        """Close the page and give back or close the browser context it opened.
+
+        A context or cache supplied by the caller is left open for the caller to release.
+        """
+        if self.page:
             try:
-                await self.browser.close()
+                await self.page.close()
             except Exception:
                 pass  # Ignore cleanup errors
             finally:
-                self.browser = None
                 self.page = None
-                if self._playwright:
-                    await self._playwright.stop()
-                    self._playwright = None
+        if self.context and self._owns_context:
+            await self._close_context()
+        if self._cache and self._owns_cache:
+            await asyncio.to_thread(self._cache.close)
+
+    async def _close_context(self):
+        """Close an isolated context, or hand a pooled one back to the pool."""
+        context, self.context = self.context, None
+        if self.isolated:
+            try:
+                await context.close()
+            except Exception:
+                pass  # Ignore cleanup errors
+        else:
+            await pool.release(context)
+
+    async def navigate(
+        self,
+        url: str,
+        timeout: Optional[int] = None,
+        ready_selector: Optional[str] = None,
+        thorough: bool = False
+    ) -> str:
+        """Navigate to a URL with enhanced error handling and validation.
+
+        Args:
+            url (str): URL to visit, "https://" is assumed when no scheme is given
+            timeout (Optional[int]): Operation timeout in milliseconds
+            ready_selector (Optional[str]): Content element to wait for, until visible,
+                once the DOM is loaded
+            thorough (bool): Also wait for the network to go idle, for pages that
+                render their content late
+
+        Returns:
+            str: Success message
 
-    async def navigate(self, url: str, timeout: Optional[int] = None) -> str:
-        """Navigate to a URL with enhanced error handling and validation."""
+        Raises:
+            NavigationError: If the URL is invalid or navigation fails
+        """
         if not self.page:
             await self.setup()
 
+        url = await self._goto(self.page, url, timeout, ready_selector, thorough)
+        return f"Successfully navigated to {url}"
+
+    async def _goto(
+        self,
+        page: Page,
+        url: str,
+        timeout: Optional[int] = None,
+        ready_selector: Optional[str] = None,
+        thorough: bool = False
+    ) -> str:
+        """Load a URL in the given page and return the URL that was visited."""
         # Validate and format URL
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
@@ -117,11 +280,12 @@ class BrowserTools:
         if not self.validate_url(url):
             raise NavigationError(f"Invalid URL format: {url}")
 
+        timeout = timeout or self.default_timeout
         try:
-            response = await self.page.goto(
+            response = await page.goto(
                 url,
-                timeout=timeout or self.default_timeout,
-                wait_until='networkidle'
+                timeout=timeout,
+                wait_until='networkidle' if thorough else 'domcontentloaded'
             )
 
             if not response:
@@ -130,10 +294,11 @@ class BrowserTools:
             if response.status >= 400:
                 raise NavigationError(f"Failed to navigate to {url}: Status {response.status}")
 
-            # Wait for page to be fully loaded
-            await self.page.wait_for_load_state('networkidle')
+            # Wait for the content we need rather than for the network to go quiet
+            if ready_selector:
+                await page.wait_for_selector(ready_selector, timeout=timeout)
 
-            return f"Successfully navigated to {url}"
+            return url
 
         except PlaywrightTimeout:
             raise NavigationError(f"Navigation to {url} timed out")
@@ -145,42 +310,93 @@ class BrowserTools:
         if not self.page:
             raise BrowserError("Browser not initialized")
 
+        return await self._extract(self.page, selectors)
+
+    @staticmethod
+    async def _extract(page: Page, selectors: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Extract content from the given page."""
         try:
-            # Default content extraction if no selectors provided
+            # Title, URL, text, main content, links and custom selectors in a single round-trip
+            extracted = await page.evaluate(CALL_EXTRACT_JS, selectors or {})
+            if extracted is None:
+                # Document loaded before the init script was installed
+                extracted = await page.evaluate(EXTRACT_JS, selectors or {})
             content = {
-                "title": await self.page.title(),
-                "url": self.page.url,
-                "text": await self.page.evaluate('document.body.innerText'),
-                "main_content": await self.page.evaluate("""
-                    () => {
-                        const article = document.querySelector('article, main, [role="main"]');
-                        if (article) return article.innerText;
-                        const content = document.querySelector('.content, #content, [class*="content"]');
-                        if (content) return content.innerText;
-                        return document.body.innerText;
-                    }
-                """),
-                "links": await self.page.evaluate("""
-                    () => Array.from(document.querySelectorAll('a[href]')).map(a => ({
-                        text: a.innerText,
-                        href: a.href
-                    })).filter(link => link.text.trim() && link.href.startsWith('http'))
-                """)
+                "title": extracted["title"],
+                "url": extracted["url"],
+                "text": extracted["text"],
+                "main_content": extracted["main_content"],
+                "links": extracted["links"]
             }
 
             # Add custom selector content if provided
-            if selectors:
-                for key, selector in selectors.items():
-                    try:
-                        content[key] = await self.page.inner_text(selector)
-                    except Exception as e:
-                        content[key] = f"Failed to extract: {str(e)}"
+            selected = {key: extracted["selected"].get(key) for key in (selectors or {})}
+            missing = [key for key, value in selected.items() if value is None]
+            if missing:
+                # Not rendered yet or not plain CSS: one short auto-waiting read each, side by side
+                retried = await asyncio.gather(
+                    *(page.inner_text(selectors[key], timeout=SELECTOR_RETRY_TIMEOUT) for key in missing),
+                    return_exceptions=True
+                )
+                for key, value in zip(missing, retried):
+                    selected[key] = f"Failed to extract: {str(value)}" if isinstance(value, Exception) else value
+            content.update(selected)
 
             return content
 
         except Exception as e:
             raise ContentExtractionError(f"Failed to extract content: {str(e)}")
 
+    async def navigate_and_extract_many(
+        self,
+        urls: List[str],
+        selectors: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Visit several URLs concurrently and extract the content of each.
+
+        Every URL gets its own fresh browser context, closed afterwards, so the
+        loads share neither connections nor storage, and at most pool-size loads
+        run at once.
+
+        Args:
+            urls (List[str]): URLs to visit
+            selectors (Optional[Dict[str, str]]): Custom selectors to extract from every page
+
+        Returns:
+            List[Dict[str, Any]]: Extracted content per URL, in input order. A URL
+            that fails yields {"url": ..., "error": ...} instead.
+        """
+        semaphore = asyncio.Semaphore(max(1, pool.size))
+
+        async def fetch(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                context = await pool.new_context()
+                try:
+                    return await self._fetch_one(context, url, selectors)
+                finally:
+                    await context.close()
+
+        results = await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+        return [
+            {"url": url, "error": str(result)} if isinstance(result, Exception) else result
+            for url, result in zip(urls, results)
+        ]
+
+    async def _fetch_one(
+        self,
+        context: BrowserContext,
+        url: str,
+        selectors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Open a page in the given context, load the URL and extract its content."""
+        page = await context.new_page()
+        try:
+            await self._prepare_page(page)
+            await self._goto(page, url)
+            return await self._extract(page, selectors)
+        finally:
+            await page.close()
+
     async def click(self, selector: str, timeout: Optional[int] = None) -> str:
         """Click an element on the page with timeout.
 
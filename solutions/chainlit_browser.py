@@ -1,34 +1,31 @@
 import os
-from typing import Optional, AsyncGenerator
+import re
+from typing import AsyncGenerator, Optional
 from dotenv import load_dotenv
 import chainlit as cl
 import groq
+import httpx
 from browser_tools import BrowserTools
 
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Groq client
-client = groq.Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Initialize Groq client on a keep-alive HTTP/2 connection pool shared by every chat turn
+http_client = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=64, keepalive_expiry=60)
+)
+client = groq.Groq(api_key=os.getenv("GROQ_API_KEY"), http_client=http_client)
 MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "1024"))
 TOP_P = float(os.getenv("TOP_P", "1.0"))
 
+# Conversation memory kept per session, roughly 2K tokens
+HISTORY_MAX_CHARS = 8000
 
-def get_prompt(instruction: str, history: Optional[list[str]] = None) -> str:
-    if history:
-        context = f"Previous conversation: {''.join(history)}\n\n"
-    else:
-        context = ""
-
-    return f"{context}{instruction}"
-
-
-async def generate_response(prompt: str) -> AsyncGenerator[str, None]:
-    """Generate streaming response from Groq's LLaMA model."""
-    system = """You are a helpful web browsing assistant powered by LLaMA 3.3 70B Versatile. You can help users browse the web by:
+SYSTEM_PROMPT = """You are a helpful web browsing assistant powered by LLaMA 3.3 70B Versatile. You can help users browse the web by:
     1. Navigation: Use 'navigate to [url]' to visit websites
     2. Content Extraction: Use 'extract' to get and summarize webpage content
     3. Interaction: Use 'click [selector]' to click on elements
@@ -49,35 +46,64 @@ async def generate_response(prompt: str) -> AsyncGenerator[str, None]:
     - Be specific in your responses
     - Handle errors gracefully
     - Summarize extracted content concisely"""
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
 
-    try:
-        completion = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=TEMPERATURE,
-            max_tokens=MAX_TOKENS,
-            top_p=TOP_P,
-            stream=True
-        )
-
-        for chunk in completion:
-            if chunk.choices[0].delta.content is not None:
-                yield chunk.choices[0].delta.content
-    except Exception as e:
-        yield f"\nI apologize, but I encountered an error: {str(e)}\nPlease try again."
+# Browser commands in the model's reply: verb, target and optional "with" value.
+# Arguments are either quoted (and may contain spaces) or a bare word that runs to
+# the next whitespace, so selectors like button[type="submit"] stay whole.
+CMD_ARG = r"""(?:"([^"]*)"|'([^']*)'|`([^`]*)`|([^\s"'`]\S*))"""
+CMD_RE = re.compile(rf"(?i)\b(navigate to|click|fill|extract)\b(?:\s+{CMD_ARG}(?:\s+with\s+{CMD_ARG})?)?")
+
+
+def command_args(match: re.Match) -> tuple[Optional[str], Optional[str]]:
+    """Return the (target, value) of a CMD_RE match, unwrapping quoted arguments."""
+    args = []
+    for double_quoted, single_quoted, backticked, bare in (match.groups()[1:5], match.groups()[5:9]):
+        if bare is not None:
+            args.append(bare.strip('.,"\'` ') or None)
+        else:
+            args.append(next((arg for arg in (double_quoted, single_quoted, backticked) if arg is not None), None))
+    return args[0], args[1]
+
+
+def trim_messages(messages: list[dict]) -> None:
+    """Drop the oldest turns until the conversation fits the history budget.
+
+    The system message and the latest message are always kept.
+    """
+    size = sum(len(m["content"]) for m in messages[1:])
+    while size > HISTORY_MAX_CHARS and len(messages) > 2:
+        size -= len(messages.pop(1)["content"])
+
+
+async def generate_response(messages: list[dict]) -> AsyncGenerator[str, None]:
+    """Generate streaming response from Groq's LLaMA model.
+
+    API errors propagate to the caller, so they never end up in the conversation.
+    """
+    completion = client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        top_p=TOP_P,
+        stream=True
+    )
+
+    for chunk in completion:
+        if chunk.choices[0].delta.content is not None:
+            yield chunk.choices[0].delta.content
 
 
 @cl.on_chat_start
 async def on_chat_start():
-    # Initialize browser tools
-    browser_tools = BrowserTools()
+    # The session gets its own isolated context on the shared browser, created on
+    # the first browser command so launch errors surface there, not at chat start
+    browser_tools = BrowserTools(isolated=True)
 
     # Store in session
     cl.user_session.set("browser_tools", browser_tools)
-    cl.user_session.set("history", [])
+    cl.user_session.set("messages", [SYSTEM_MESSAGE])
 
     await cl.Message(
         content="""👋 Hello! I'm your web browsing assistant powered by LLaMA 3.3 70B Versatile.
@@ -100,7 +126,9 @@ What would you like me to do?"""
 @cl.on_message
 async def on_message(message: cl.Message):
     browser_tools = cl.user_session.get("browser_tools")
-    history = cl.user_session.get("history")
+    messages = cl.user_session.get("messages")
+    messages.append({"role": "user", "content": message.content})
+    trim_messages(messages)
 
     try:
         # Create a new message with thinking indicator
@@ -108,54 +136,63 @@ async def on_message(message: cl.Message):
         await msg.send()
 
         # Get LLM's response
-        prompt = get_prompt(message.content, history)
-        response = ""
+        chunks = []
 
-        async for word in generate_response(prompt):
+        async for word in generate_response(messages):
             if word:  # Only process non-empty tokens
                 await msg.stream_token(word)
-                response += word
+                chunks.append(word)
+        response = "".join(chunks)
 
         if not response.strip():  # If response is empty or just whitespace
+            messages.pop()
             await msg.update(content="I apologize, but I didn't receive a proper response. Please try again.")
             return
+
+        # Store the interaction in history
+        messages.append({"role": "assistant", "content": response})
     except Exception as e:
-        await cl.Message(f"An error occurred: {str(e)}").send()
+        # Drop the unanswered turn so the error is not replayed to the model
+        messages.pop()
+        await cl.Message(f"I apologize, but I encountered an error: {str(e)}\nPlease try again.").send()
         return
 
     try:
-        # Execute browser actions based on response
-        if "navigate to" in response.lower():
-            # Extract URL more reliably with error handling
-            parts = response.lower().split("navigate to", 1)
-            if len(parts) > 1:
-                url = parts[1].split()[0].strip('"`\'., ')
-                if not url.startswith(('http://', 'https://')):
-                    url = 'https://' + url
+        # Execute browser actions based on response, in one pass over the text
+        commands: dict[str, list[re.Match]] = {}
+        for match in CMD_RE.finditer(response):
+            commands.setdefault(match.group(1).lower(), []).append(match)
+
+        if "navigate to" in commands:
+            urls = [url for url, _ in map(command_args, commands["navigate to"]) if url]
+            urls = ['https://' + url if not url.startswith(('http://', 'https://')) else url for url in urls]
+            # The model often repeats a command; only distinct pages count
+            urls = list(dict.fromkeys(urls))
+            if len(urls) > 1:
+                # Several pages requested: load them side by side
+                for content in await browser_tools.navigate_and_extract_many(urls):
+                    await msg.stream_token(f"\n\nExtracted content: {str(content)}")
+            elif urls:
+                url = urls[0]
                 result = await browser_tools.navigate(url)
                 await msg.stream_token(f"\n\nNavigated to {url}. Result: {result}")
 
-        elif "click" in response.lower():
-            parts = response.lower().split("click", 1)
-            if len(parts) > 1:
-                selector = parts[1].split()[0].strip('"`\'., ')
+        elif "click" in commands:
+            selector, _ = command_args(commands["click"][0])
+            if selector:
                 result = await browser_tools.click(selector)
                 await msg.stream_token(f"\n\nClicked {selector}. Result: {result}")
 
-        elif "fill" in response.lower():
-            parts = response.lower().split("fill", 1)[1].split("with", 1)
-            if len(parts) == 2:
-                selector = parts[0].strip('"`\'., ')
-                value = parts[1].strip('"`\'., ')
+        elif "fill" in commands:
+            selector, value = command_args(commands["fill"][0])
+            if selector and value is not None:
                 result = await browser_tools.fill_form(selector, value)
                 await msg.stream_token(f"\n\nFilled {selector} with value. Result: {result}")
 
-        elif "extract" in response.lower():
+        elif "extract" in commands:
             content = await browser_tools.extract_content()
             await msg.stream_token(f"\n\nExtracted content: {str(content)}")
 
-        # Store the interaction in history
-        history.append(response)
         await msg.update()
 
     except Exception as e:
@@ -1,39 +1,70 @@
+import json
+import os
+from typing import AsyncGenerator
+
 import chainlit as cl
-from ctransformers import AutoModelForCausalLM
+import httpx
+
+# The model is served by a long-running llama.cpp server, started once with e.g.
+#   ./server -m orca-mini-3b.q4_0.gguf -c 2048 --parallel 4
+LLAMA_SERVER_URL = os.getenv("LLAMA_SERVER_URL", "http://localhost:8080")
+MAX_NEW_TOKENS = int(os.getenv("MAX_NEW_TOKENS", "256"))
+HISTORY_MAX_CHARS = 8000
+
+SYSTEM_PROMPT = "You are an AI assistant that gives helpful answers. You answer the question in a short and concise way."
+PROMPT_PREFIX = f"### System:\n{SYSTEM_PROMPT}\n\n### User:\n"
+PROMPT_SUFFIX = "\n\n### Response:\n"
+
+# Generation may take a while between tokens, but an unreachable server should fail fast
+llama_client = httpx.AsyncClient(base_url=LLAMA_SERVER_URL, timeout=httpx.Timeout(None, connect=5.0))
 
 
-def get_prompt(instruction: str, history: list[str]) -> str:
-    system = "You are an AI assistant that gives helpful answers. You answer the question in a short and concise way."
-    prompt = f"### System:\n{system}\n\n### User:\n"
-    if len(history) > 0:
-        prompt += f"This is the conversation history: {''.join(history)}. Now answer the question: "
-    prompt += f"{instruction}\n\n### Response:\n"
+def get_prompt(instruction: str, history: str) -> str:
+    context = f"This is the conversation history: {history}. Now answer the question: " if history else ""
+    prompt = f"{PROMPT_PREFIX}{context}{instruction}{PROMPT_SUFFIX}"
     print(f"Prompt created: {prompt}")
     return prompt
 
 
+async def llm(prompt: str) -> AsyncGenerator[str, None]:
+    """Stream completion tokens from the llama.cpp server."""
+    payload = {"prompt": prompt, "n_predict": MAX_NEW_TOKENS, "stream": True}
+    async with llama_client.stream("POST", "/completion", json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            # Server-sent events: each payload line is "data: {...}"
+            if not line.startswith("data: "):
+                continue
+            chunk = json.loads(line[len("data: "):])
+            if chunk.get("content"):
+                yield chunk["content"]
+            if chunk.get("stop"):
+                break
+
+
 @cl.on_message
 async def on_message(message: cl.Message):
-    message_history = cl.user_session.get("message_history")
+    history_text = cl.user_session.get("history_text")
     msg = cl.Message(content="")
     await msg.send()
 
-    prompt = get_prompt(message.content, message_history)
-    answer = ""
-    for word in llm(prompt, stream=True):
-        await msg.stream_token(word)
-        answer += word
-    message_history.append(answer)
+    prompt = get_prompt(message.content, history_text)
+    chunks = []
+    try:
+        async for word in llm(prompt):
+            await msg.stream_token(word)
+            chunks.append(word)
+    except httpx.HTTPError as e:
+        msg.content = f"An error occurred: {str(e)}"
+        await msg.update()
+        return
+    answer = "".join(chunks)
+    cl.user_session.set("history_text", (history_text + answer + "\n")[-HISTORY_MAX_CHARS:])
     await msg.update()
 
 
 @cl.on_chat_start
 async def on_chat_start():
-    global llm
-    llm = AutoModelForCausalLM.from_pretrained(
-        "zoltanctoth/orca_mini_3B-GGUF", model_file="orca-mini-3b.q4_0.gguf"
-    )
-
-    cl.user_session.set("message_history", [])
+    cl.user_session.set("history_text", "")
 
     await cl.Message("Model initialized. How can I help you?").send()
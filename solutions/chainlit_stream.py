@@ -1,5 +1,8 @@
+from contextlib import aclosing
+
 import chainlit as cl
 from ctransformers import AutoModelForCausalLM
+from llm_stream import stream_llm
 
 
 def get_prompt(instruction: str, history: list[str] | None = None) -> str:
@@ -18,8 +21,9 @@ async def on_message(message: cl.Message):
     await msg.send()
 
     prompt = get_prompt(message.content)
-    for word in llm(prompt, stream=True):
-        await msg.stream_token(word)
+    async with aclosing(stream_llm(llm, prompt)) as words:
+        async for word in words:
+            await msg.stream_token(word)
     await msg.update()
 
 
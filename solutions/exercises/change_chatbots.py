@@ -1,7 +1,11 @@
+from contextlib import aclosing
 from typing import List
 
 import chainlit as cl
 from ctransformers import AutoModelForCausalLM
+# Shared with the other solutions; run from solutions/ with
+#   PYTHONPATH=. chainlit run exercises/change_chatbots.py
+from llm_stream import stream_llm
 
 
 def get_prompt_orca(instruction: str, history: List[str] = None) -> str:
@@ -59,11 +63,12 @@ async def on_message(message: cl.Message):
     await msg.send()
 
     prompt = get_prompt(message.content, message_history)
-    answer = ""
-    for word in llm(prompt, stream=True):
-        await msg.stream_token(word)
-        answer += word
-    message_history.append(answer)
+    chunks = []
+    async with aclosing(stream_llm(llm, prompt)) as words:
+        async for word in words:
+            await msg.stream_token(word)
+            chunks.append(word)
+    message_history.append("".join(chunks))
     await msg.update()
 
 
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Query parameters that only bust caches or track clicks. Generic names such as
+# "t" or "sid" carry meaning on some sites, so extra ones are opt-in through
+# BROWSER_CACHE_VOLATILE_PARAMS (comma-separated).
+VOLATILE_PARAMS = {"_", "fbclid", "gclid", "dclid", "msclkid"} | {
+    param.strip().lower() for param in os.getenv("BROWSER_CACHE_VOLATILE_PARAMS", "").split(",") if param.strip()
+}
+VOLATILE_PREFIXES = ("utm_",)
+
+# Headers that no longer describe a body which has already been decoded, or that
+# belong to one user's session and must never be replayed to another
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+CachedResponse = Tuple[int, Dict[str, str], bytes]
+
+
+def normalize_url(url: str) -> str:
+    """Strip volatile query parameters and sort the remaining ones.
+
+    Args:
+        url (str): URL to normalize
+
+    Returns:
+        str: Normalized URL without fragment
+    """
+    parts = urlsplit(url)
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in VOLATILE_PARAMS and not key.lower().startswith(VOLATILE_PREFIXES)
+    )
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+def normalize_body(body: Optional[bytes]) -> bytes:
+    """Canonicalize a JSON request body so key order does not matter.
+
+    Any other body is kept byte for byte.
+    """
+    if not body:
+        return b""
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        return body
+
+
+def request_key(method: str, url: str, body: Optional[bytes] = None) -> str:
+    """Build the cache signature for a request."""
+    signature = hashlib.sha256(f"{method.upper()}\n{normalize_url(url)}\n".encode("utf-8"))
+    signature.update(normalize_body(body))
+    return signature.hexdigest()
+
+
+def is_storable(status: int, headers: Dict[str, str]) -> bool:
+    """Tell whether a response may be recorded in the shared cache."""
+    cache_control = next((value for name, value in headers.items() if name.lower() == "cache-control"), "")
+    directives = {directive.strip().split("=")[0].lower() for directive in cache_control.split(",")}
+    return status < 400 and not directives & {"private", "no-store"}
+
+
+class HttpCache:
+    """A small sqlite-backed store of recorded HTTP responses.
+
+    Methods block on disk I/O; async callers should run them with
+    asyncio.to_thread. A lock makes the shared connection safe across threads.
+
+    Attributes:
+        path (str): Location of the sqlite database file
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("BROWSER_CACHE_PATH", ".browser_cache.sqlite")
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB)"
+            )
+        return self._db
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the recorded (status, headers, body) for a key, if any."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT status, headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, body = row
+        return status, json.loads(headers), body
+
+    def put(self, key: str, status: int, headers: Dict[str, str], body: bytes):
+        """Record a response under a key, replacing any previous entry."""
+        headers = {name: value for name, value in headers.items() if name.lower() not in DROPPED_HEADERS}
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, status, headers, body) VALUES (?, ?, ?, ?)",
+                (key, status, json.dumps(headers), body),
+            )
+            db.commit()
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,35 @@
+import asyncio
+import threading
+from typing import AsyncGenerator, Callable, Iterable, Optional
+
+# ctransformers models are not thread-safe, so only one generation runs at a time
+_llm_lock = threading.Lock()
+
+
+async def stream_llm(llm: Callable[..., Iterable[str]], prompt: str) -> AsyncGenerator[str, None]:
+    """Run a blocking ctransformers stream in a worker thread and yield its tokens.
+
+    The event loop stays free while the model generates. Close the generator
+    (e.g. with contextlib.aclosing) to stop generation early.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[Optional[str]] = asyncio.Queue()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            with _llm_lock:
+                for word in llm(prompt, stream=True):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, word)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+    try:
+        while (word := await queue.get()) is not None:
+            yield word
+    finally:
+        stop.set()
+        await producer  # Re-raise errors from the worker thread